@@ -1,15 +1,25 @@
 """.. include:: ../../README.md"""  # noqa: D415
 
+import asyncio
+import codecs
+import contextlib
+import io
 import logging
 import os
 import pathlib as pl
+import selectors
 import shlex
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
 import typing
-from collections import deque
 from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime
-from functools import partial
-from subprocess import PIPE, Popen
+from datetime import timedelta
+from functools import lru_cache, partial
+from subprocess import DEVNULL, PIPE, Popen
 
 from styxdefs import (
     Execution,
@@ -25,17 +35,227 @@ if os.name == "posix":
 else:
     _HOST_UID = None
 
+if sys.platform == "linux":
+    import fcntl
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+_ENV_FILE_MIN_VARS = 5
+_PIPE_READ_SIZE = 1 << 16
+_PIPE_BUFFER_SIZE = 1 << 18
+_utf8_decoder = codecs.getincrementaldecoder("utf-8")
+_MAX_CONCURRENT_PULLS = 4
+
+_io_pool: ThreadPoolExecutor | None = None
+_io_pool_lock = threading.Lock()
+
+
+def _shared_io_pool() -> ThreadPoolExecutor:
+    """Get the process-wide thread pool used to drain pipes."""
+    global _io_pool
+    with _io_pool_lock:
+        if _io_pool is None:
+            _io_pool = ThreadPoolExecutor(
+                max_workers=min(32, (os.cpu_count() or 4) * 2),
+                thread_name_prefix="styx_podman_io",
+            )
+        return _io_pool
+
+
+@lru_cache(maxsize=1024)
+def _normalize_tag(tag: str) -> str:
+    """Qualify a container image tag with the docker.io registry."""
+    if tag.startswith("docker://"):
+        return tag.replace("docker://", "docker.io/", 1)
+    if not tag.startswith("docker.io/"):
+        return f"docker.io/{tag}"
+    return tag
+
+
+# Podman run options that select which image variant to use
+_PLATFORM_OPTIONS = ("--platform", "--arch", "--os", "--variant")
+
+
+def _platform_args(podman_args: list[str]) -> list[str]:
+    """Extract the platform selection options from podman run arguments."""
+    platform_args: list[str] = []
+    args = iter(podman_args)
+    for arg in args:
+        if arg in _PLATFORM_OPTIONS:
+            value = next(args, None)
+            if value is not None:
+                platform_args.extend((arg, value))
+        elif arg.startswith(tuple(f"{option}=" for option in _PLATFORM_OPTIONS)):
+            platform_args.append(arg)
+    return platform_args
+
+
+# Podman run options that trade isolation for faster rootless start-up, keyed by
+# the option names (including aliases) a user could set them with
+_FAST_ROOTLESS_OPTIONS: tuple[tuple[tuple[str, ...], tuple[str, ...]], ...] = (
+    (("--userns",), ("--userns=keep-id",)),
+    (("--network", "--net"), ("--network=none",)),
+    (("--security-opt",), ("--security-opt", "label=disable")),
+    (("--pids-limit",), ("--pids-limit=-1",)),
+)
+
+
+def _fast_rootless_args(podman_args: list[str]) -> list[str]:
+    """Get the fast rootless options not already set in podman run arguments."""
+    user_options = {arg.split("=", 1)[0] for arg in podman_args if arg[:2] == "--"}
+    return [
+        arg
+        for names, args in _FAST_ROOTLESS_OPTIONS
+        if user_options.isdisjoint(names)
+        for arg in args
+    ]
+
+
+_MOUNT_ESCAPE = str.maketrans({'"': r"\"", "\\": "\\\\"})
+
 
 def _podman_mount(host_path: str, container_path: str, readonly: bool) -> str:
     """Construct Podman mount argument."""
-    host_path = host_path.replace('"', r"\"")
-    container_path = container_path.replace('"', r"\"")
-    host_path = host_path.replace("\\", "\\\\")
-    container_path = container_path.replace("\\", "\\\\")
+    if "," in host_path:
+        # Podman splits mount options on commas without honouring any quoting
+        raise ValueError(f'Cannot mount path containing ",": "{host_path}"')
+    # Real-world paths rarely need escaping, so skip the translation if possible
+    if '"' in host_path or "\\" in host_path:
+        host_path = host_path.translate(_MOUNT_ESCAPE)
+    if '"' in container_path or "\\" in container_path:
+        container_path = container_path.translate(_MOUNT_ESCAPE)
     readonly_str = ",readonly" if readonly else ""
     return f"type=bind,source={host_path},target={container_path}{readonly_str}"
 
 
+class _LineReader:
+    """Decode a byte stream in chunks and dispatch complete lines."""
+
+    def __init__(self, handler: typing.Callable[[str], None]) -> None:
+        """Create _LineReader."""
+        self._handler = handler
+        self._decoder = io.IncrementalNewlineDecoder(
+            _utf8_decoder(errors="replace"), translate=True
+        )
+        # Pieces of the current partial line, joined once its newline arrives
+        self._pending: list[str] = []
+
+    def _dispatch(self, lines: list[str]) -> None:
+        """Pass lines to the handler."""
+        for line in lines:
+            self._handler(line)
+
+    def feed(self, data: bytes, final: bool = False) -> None:
+        """Decode a chunk and pass every completed line to the handler."""
+        text = self._decoder.decode(data, final=final)
+        lines: list[str] = []
+        if "\n" in text:
+            first, *rest = text.split("\n")
+            self._pending.append(first)
+            lines.append("".join(self._pending))
+            lines.extend(rest[:-1])
+            self._pending = [rest[-1]] if rest[-1] else []
+        elif text:
+            self._pending.append(text)
+        if final and self._pending:
+            lines.append("".join(self._pending))
+            self._pending = []
+        if lines:
+            self._dispatch(lines)
+
+
+class _LogLineReader(_LineReader):
+    """Log the lines decoded from each chunk as a single record."""
+
+    def __init__(self, logger: logging.Logger, level: int) -> None:
+        """Create _LogLineReader."""
+        super().__init__(partial(logger.log, level, "%s"))
+
+    def _dispatch(self, lines: list[str]) -> None:
+        """Join lines into one record."""
+        self._handler("\n".join(lines))
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """Write all of data to a file descriptor, retrying short writes."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def _drain_stream(stream: typing.IO[bytes], reader: _LineReader) -> None:
+    """Read a single pipe until EOF."""
+    fd = stream.fileno()
+    while chunk := os.read(fd, _PIPE_READ_SIZE):
+        reader.feed(chunk)
+    reader.feed(b"", final=True)
+
+
+async def _drain_stream_async(
+    stream: asyncio.StreamReader, reader: _LineReader
+) -> None:
+    """Read a single asyncio pipe until EOF."""
+    while chunk := await stream.read(_PIPE_READ_SIZE):
+        reader.feed(chunk)
+    reader.feed(b"", final=True)
+
+
+def _kill_if_running(process: asyncio.subprocess.Process) -> None:
+    """Kill a subprocess unless it has already exited."""
+    if hasattr(os, "waitid"):
+        # Process.kill() polls, which would reap an exited child behind the asyncio
+        # child watcher's back, so check for an exit without reaping and signal
+        # the pid directly
+        try:
+            status = os.waitid(
+                os.P_PID, process.pid, os.WEXITED | os.WNOHANG | os.WNOWAIT
+            )
+        except ChildProcessError:
+            # Already reaped by the child watcher
+            return
+        if status is None:
+            os.kill(process.pid, signal.SIGKILL)
+        return
+    try:
+        process.kill()
+    except ProcessLookupError:
+        pass
+
+
+def _grow_pipe(stream: typing.IO[bytes]) -> None:
+    """Enlarge a pipe's kernel buffer so the writer blocks less often."""
+    if sys.platform == "linux":
+        try:
+            fcntl.fcntl(stream.fileno(), fcntl.F_SETPIPE_SZ, _PIPE_BUFFER_SIZE)
+        except OSError:
+            # Unprivileged users are capped by /proc/sys/fs/pipe-max-size
+            pass
+
+
+def _drain_pipes(pipes: list[tuple[typing.IO[bytes], _LineReader]]) -> None:
+    """Read process pipes until EOF, dispatching lines as they arrive."""
+    if os.name != "posix":
+        # Pipes cannot be polled with select() on Windows. The first pipe is drained
+        # on the calling thread so each execution holds at most one pool worker.
+        futures = [_shared_io_pool().submit(_drain_stream, *pipe) for pipe in pipes[1:]]
+        _drain_stream(*pipes[0])
+        for future in futures:
+            future.result()
+        return
+
+    with selectors.DefaultSelector() as selector:
+        for stream, reader in pipes:
+            _grow_pipe(stream)
+            selector.register(stream, selectors.EVENT_READ, reader)
+        while selector.get_map():
+            for key, _ in selector.select():
+                chunk = os.read(key.fd, _PIPE_READ_SIZE)
+                if chunk:
+                    key.data.feed(chunk)
+                else:
+                    key.data.feed(b"", final=True)
+                    selector.unregister(key.fileobj)
+
+
 class StyxPodmanError(StyxRuntimeError):
     """Styx Podman runtime error."""
 
@@ -71,16 +291,75 @@ class _PodmanExecution(Execution):
     ) -> None:
         """Create PodmanExecution."""
         self.logger: logging.Logger = logger
-        self.input_mounts: list[tuple[pl.Path, str, bool]] = []
+        self._mount_targets: dict[tuple[str, bool], str] = {}
+        self._mount_args: list[str] = []
         self.input_file_next_id = 0
         self.output_dir = output_dir
+        self._output_dir_posix = output_dir.absolute().as_posix()
+        self._podman_command: list[str] | None = None
         self.metadata = metadata
         self.container_tag = container_tag
         self.podman_executable = podman_executable
         self.podman_extra_args = podman_extra_args
         self.podman_user_id = podman_user_id
+        # Snapshot so later changes to the runner's environment cannot make the env
+        # file and the inline arguments disagree
+        environ = dict(environ)
         self.environ = environ
 
+        # Everything but the input mounts is fixed for the lifetime of the execution
+        self._cmd_prefix: tuple[str, ...] = (
+            podman_executable,
+            "run",
+            *podman_extra_args,
+            "--rm",
+            "--name",
+            f"styx_{output_dir.name}",
+            *(("-u", str(podman_user_id)) if podman_user_id is not None else ()),
+            "-w",
+            "/styx_output",
+        )
+        # Large environments go through an env file (podman's format is line-based)
+        self._env_file_data: bytes | None = (
+            "".join(f"{key}={value}\n" for key, value in environ.items()).encode()
+            if len(environ) >= _ENV_FILE_MIN_VARS
+            and not any("\n" in value or "\r" in value for value in environ.values())
+            else None
+        )
+        self._cmd_suffix: tuple[str, ...] = (
+            "--mount",
+            _podman_mount(self._output_dir_posix, "/styx_output", readonly=False),
+            "--entrypoint",
+            "/bin/bash",
+            *(
+                ()
+                if self._env_file_data is not None
+                else (
+                    arg
+                    for key, value in environ.items()
+                    for arg in ("--env", f"{key}={value}")
+                )
+            ),
+        )
+
+    @contextlib.contextmanager
+    def _env_file_args(self) -> typing.Iterator[list[str]]:
+        """Write a private env file for the duration of a run, if one is used."""
+        if self._env_file_data is None:
+            yield []
+            return
+        # Kept outside the mounted output directory and removed after the run, since
+        # environment values may be credentials
+        fd, env_file = tempfile.mkstemp(prefix="styx_env_", suffix=".list")
+        try:
+            try:
+                _write_all(fd, self._env_file_data)
+            finally:
+                os.close(fd)
+            yield ["--env-file", env_file]
+        finally:
+            os.unlink(env_file)
+
     def input_file(
         self,
         host_file: InputPathType,
@@ -88,11 +367,11 @@ class _PodmanExecution(Execution):
         mutable: bool = False,
     ) -> str:
         """Resolve input file."""
-        _host_file = pl.Path(host_file)
+        _host_file = os.path.abspath(host_file)
 
         if resolve_parent:
-            _host_file_parent = _host_file.parent
-            if not _host_file_parent.is_dir():
+            _host_file_parent = os.path.dirname(_host_file)
+            if not os.path.isdir(_host_file_parent):
                 # If Podman gets passed a file to mount which does not exist it will
                 # create a directory at this location.
                 # This odd behaviour can lead to cryptic error messages downstream so we
@@ -101,26 +380,45 @@ class _PodmanExecution(Execution):
                     f'Input folder not found: "{_host_file_parent}"'
                 )
 
-            local_file = (
-                f"/styx_input/{self.input_file_next_id}/{_host_file_parent.name}"
-            )
-            resolved_file = f"{local_file}/{_host_file.name}"
-            self.input_mounts.append((_host_file_parent, local_file, mutable))
+            local_file = self._mount(_host_file_parent, mutable)
+            resolved_file = f"{local_file}/{os.path.basename(_host_file)}"
         else:
-            if not _host_file.exists():
+            if not os.path.exists(_host_file):
                 # See note above.
                 # We don't know if the 'file' here is a directory or file
                 # so we can't additionally assert that it is.
-                raise FileNotFoundError(f'Input file not found: "{_host_file}"')
+                raise FileNotFoundError(f'Input file not found: "{host_file}"')
 
-            resolved_file = local_file = (
-                f"/styx_input/{self.input_file_next_id}/{_host_file.name}"
-            )
-            self.input_mounts.append((_host_file, local_file, mutable))
+            resolved_file = self._mount(_host_file, mutable)
 
-        self.input_file_next_id += 1
         return resolved_file
 
+    def _mount(self, host_path: str, mutable: bool) -> str:
+        """Register a bind mount, reusing an existing one for the same host path."""
+        host_posix = host_path if os.sep == "/" else host_path.replace(os.sep, "/")
+        key = (host_posix, mutable)
+        local_path = self._mount_targets.get(key)
+        if local_path is None:
+            local_path = (
+                f"/styx_input/{self.input_file_next_id}/{os.path.basename(host_path)}"
+            )
+            # Format the mount now so invalid paths are reported by input_file
+            self._mount_args.extend(
+                ("--mount", _podman_mount(host_posix, local_path, not mutable))
+            )
+            self._mount_targets[key] = local_path
+            self.input_file_next_id += 1
+            self._podman_command = None
+        return local_path
+
+    @property
+    def input_mounts(self) -> list[tuple[str, str, bool]]:
+        """Registered input mounts as (host path, container path, mutable)."""
+        return [
+            (host_path, local_path, mutable)
+            for (host_path, mutable), local_path in self._mount_targets.items()
+        ]
+
     def output_file(self, local_file: str, optional: bool = False) -> OutputPathType:
         """Resolve output file."""
         return self.output_dir / local_file
@@ -129,94 +427,151 @@ class _PodmanExecution(Execution):
         """No changes to params."""
         return params
 
-    def run(
-        self,
-        cargs: list[str],
-        handle_stdout: typing.Callable[[str], None] | None = None,
-        handle_stderr: typing.Callable[[str], None] | None = None,
-    ) -> None:
-        """Execute."""
-        mounts: list[str] = []
-
-        for host_file, local_file, mutable in self.input_mounts:
-            mounts.append("--mount")
-            mounts.append(
-                _podman_mount(
-                    host_file.absolute().as_posix(), local_file, readonly=not mutable
-                )
-            )
-
-        # Output directory
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+    def _iter_podman_args(self) -> typing.Iterator[str]:
+        """Yield the podman options, which only change when mounts are added."""
+        yield from self._cmd_prefix
+        yield from self._mount_args
+        yield from self._cmd_suffix
 
+    def _prepare_run(self, cargs: list[str], env_args: list[str]) -> list[str]:
+        """Write the run script and return the podman argv."""
         # Create run script
-        run_script = self.output_dir / "run.sh"
-        # Ensure utf-8 encoding and unix newlines
-        run_script.write_text(
-            f"#!/bin/bash\n{shlex.join(cargs)}\n", encoding="utf-8", newline="\n"
-        )
-
-        mounts.append("--mount")
-        mounts.append(
-            _podman_mount(
-                self.output_dir.absolute().as_posix(), "/styx_output", readonly=False
-            )
-        )
-
-        environ_arg_args: list[str] = []
-        for key, value in self.environ.items():
-            environ_arg_args.extend(["--env", f"{key}={value}"])
-
-        podman_command: list[str] = [
-            self.podman_executable,
-            "run",
-            *self.podman_extra_args,
-            "--rm",
-            "--name",
-            f"styx_{self.output_dir.name}",
-            *(
-                ["-u", str(self.podman_user_id)]
-                if self.podman_user_id is not None
-                else []
-            ),
-            "-w",
-            "/styx_output",
-            *mounts,
-            "--entrypoint",
-            "/bin/bash",
-            *environ_arg_args,
+        # Ensure utf-8 encoding and unix newlines; `exec` replaces the shell with the
+        # command instead of forking it
+        fd = os.open(self.output_dir / "run.sh", _WRITE_FLAGS, 0o755)
+        try:
+            _write_all(fd, f"#!/bin/bash\nexec {shlex.join(cargs)}\n".encode())
+        finally:
+            os.close(fd)
+
+        if self._podman_command is None:
+            self._podman_command = list(self._iter_podman_args())
+        podman_command = [
+            *self._podman_command,
+            *env_args,
             self.container_tag,
             "./run.sh",
         ]
 
-        self.logger.debug(f"Running podman: {shlex.join(podman_command)}")
-        self.logger.debug(f"Running command: {shlex.join(cargs)}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Running podman: %s", shlex.join(podman_command))
+            self.logger.debug("Running command: %s", shlex.join(cargs))
+        return podman_command
 
-        _stdout_handler = (
-            handle_stdout if handle_stdout else lambda line: self.logger.info(line)
-        )
-        _stderr_handler = (
-            handle_stderr if handle_stderr else lambda line: self.logger.error(line)
+    def _line_readers(
+        self,
+        handle_stdout: typing.Callable[[str], None] | None,
+        handle_stderr: typing.Callable[[str], None] | None,
+    ) -> tuple[_LineReader, _LineReader]:
+        """Create stdout and stderr line readers, logging by default."""
+        return (
+            _LineReader(handle_stdout)
+            if handle_stdout
+            else _LogLineReader(self.logger, logging.INFO),
+            _LineReader(handle_stderr)
+            if handle_stderr
+            else _LogLineReader(self.logger, logging.ERROR),
         )
 
-        time_start = datetime.now()
-        with Popen(podman_command, text=True, stdout=PIPE, stderr=PIPE) as process:
-            with ThreadPoolExecutor(2) as pool:  # two threads to handle the streams
-                exhaust = partial(pool.submit, partial(deque, maxlen=0))
-                exhaust(_stdout_handler(line[:-1]) for line in process.stdout)  # type: ignore
-                exhaust(_stderr_handler(line[:-1]) for line in process.stderr)  # type: ignore
-        return_code = process.poll()
-        time_end = datetime.now()
+    def _finish_run(
+        self,
+        cargs: list[str],
+        podman_command: list[str],
+        return_code: int | None,
+        time_start: int,
+    ) -> None:
+        """Log the execution time and raise if podman failed."""
+        elapsed_ns = time.perf_counter_ns() - time_start
         self.logger.info(
-            f"Executed {self.metadata.package} {self.metadata.name} "
-            f"in {time_end - time_start}"
+            "Executed %s %s in %s",
+            self.metadata.package,
+            self.metadata.name,
+            timedelta(microseconds=elapsed_ns // 1000),
         )
         if return_code:
             raise StyxPodmanError(return_code, cargs, podman_command)
 
+    def run(
+        self,
+        cargs: list[str],
+        handle_stdout: typing.Callable[[str], None] | None = None,
+        handle_stderr: typing.Callable[[str], None] | None = None,
+    ) -> None:
+        """Execute."""
+        stdout_reader, stderr_reader = self._line_readers(handle_stdout, handle_stderr)
+
+        with self._env_file_args() as env_args:
+            podman_command = self._prepare_run(cargs, env_args)
+            time_start = time.perf_counter_ns()
+            # Pipes are read directly with os.read, so skip Python-side buffering.
+            with Popen(podman_command, stdout=PIPE, stderr=PIPE, bufsize=0) as process:
+                _drain_pipes(
+                    [
+                        (process.stdout, stdout_reader),  # type: ignore
+                        (process.stderr, stderr_reader),  # type: ignore
+                    ]
+                )
+                return_code = process.wait()
+        self._finish_run(cargs, podman_command, return_code, time_start)
+
+    async def run_async(
+        self,
+        cargs: list[str],
+        handle_stdout: typing.Callable[[str], None] | None = None,
+        handle_stderr: typing.Callable[[str], None] | None = None,
+    ) -> None:
+        """Execute on the running event loop.
+
+        Handlers are called on the event loop thread.
+        """
+        stdout_reader, stderr_reader = self._line_readers(handle_stdout, handle_stderr)
+
+        with self._env_file_args() as env_args:
+            podman_command = self._prepare_run(cargs, env_args)
+            time_start = time.perf_counter_ns()
+            process = await asyncio.create_subprocess_exec(
+                *podman_command, stdout=PIPE, stderr=PIPE
+            )
+            # asyncio's public API does not expose the pipes behind these streams, so
+            # unlike in run() they keep the kernel's default size
+            drains = [
+                asyncio.ensure_future(_drain_stream_async(stream, reader))  # type: ignore
+                for stream, reader in (
+                    (process.stdout, stdout_reader),
+                    (process.stderr, stderr_reader),
+                )
+            ]
+            exited = asyncio.ensure_future(process.wait())
+            try:
+                # Unlike gather, wait leaves the tasks running if we are cancelled
+                await asyncio.wait(
+                    [*drains, exited], return_when=asyncio.FIRST_EXCEPTION
+                )
+                for drain in drains:
+                    drain.result()
+            except BaseException:
+                # Cancelled or a handler raised; don't leave podman or the drains
+                # running
+                for drain in drains:
+                    drain.cancel()
+                if not exited.done():
+                    _kill_if_running(process)
+                await asyncio.wait([*drains, exited])
+                raise
+            return_code = exited.result()
+        self._finish_run(cargs, podman_command, return_code, time_start)
+
 
 class PodmanRunner(Runner):
-    """Podman runner."""
+    """Podman runner.
+
+    With `fast_rootless=True`, containers run in a user namespace that maps the
+    host user to itself (`--userns=keep-id`) and without networking, SELinux
+    labels or a pids limit, which shortens rootless container start-up. Options
+    also given in `podman_extra_args` keep the user's value. Tools that need
+    network access or rely on labelled volumes will not work in this mode, and
+    rootful Podman rejects `--userns=keep-id`.
+    """
 
     logger_name = "styx_podman_runner"
 
@@ -228,13 +583,24 @@ class PodmanRunner(Runner):
         podman_user_id: int | None = None,
         data_dir: InputPathType | None = None,
         environ: dict[str, str] | None = None,
+        fast_rootless: bool = False,
+        preload_images: typing.Iterable[str] | None = None,
     ) -> None:
         """Create a new PodmanRunner."""
         self.data_dir = pl.Path(data_dir or "styx_tmp")
         self.uid = os.urandom(8).hex()
+        self._name_prefix = f"{self.uid}_"
         self.execution_counter = 0
-        self.podman_executable = podman_executable
-        self.podman_extra_args = podman_extra_args or []
+        # Resolve once so spawning skips the PATH search; an absolute path is also
+        # required for subprocess to use posix_spawn
+        self.podman_executable = shutil.which(podman_executable) or podman_executable
+        podman_extra_args = podman_extra_args or []
+        # Placed first and skipped when the user sets the same option, so the
+        # user's explicit arguments always win
+        self.podman_extra_args = [
+            *(_fast_rootless_args(podman_extra_args) if fast_rootless else ()),
+            *podman_extra_args,
+        ]
         self.podman_user_id = (
             podman_user_id if podman_user_id is not None else _HOST_UID
         )
@@ -251,23 +617,75 @@ class PodmanRunner(Runner):
             ch.setFormatter(formatter)
             self.logger.addHandler(ch)
 
+        # Pull images in the background so the first execution does not wait on it
+        self._images_ready: dict[str, threading.Event] = {}
+        self._pull_slots = threading.BoundedSemaphore(_MAX_CONCURRENT_PULLS)
+        for tag in preload_images or ():
+            container_tag = _normalize_tag(self.image_overrides.get(tag, tag))
+            if container_tag not in self._images_ready:
+                self._images_ready[container_tag] = threading.Event()
+                threading.Thread(
+                    target=self._pull_image,
+                    args=(container_tag,),
+                    name="styx_podman_pull",
+                    daemon=True,
+                ).start()
+
+    def _podman_status(self, *args: str) -> tuple[int, str]:
+        """Run a podman subcommand, returning its exit code and stderr."""
+        with Popen(
+            [self.podman_executable, *args],
+            stdout=DEVNULL,
+            stderr=PIPE,
+            text=True,
+        ) as process:
+            _, stderr = process.communicate()
+        return process.returncode, stderr.strip()
+
+    def _pull_image(self, container_tag: str) -> None:
+        """Pull a container image unless it exists locally and mark it as ready."""
+        platform_args = _platform_args(self.podman_extra_args)
+        try:
+            with self._pull_slots:
+                # `image exists` ignores the platform, so always pull when one is set
+                if (
+                    platform_args
+                    or self._podman_status("image", "exists", container_tag)[0]
+                ):
+                    self.logger.info("Pulling image %s", container_tag)
+                    return_code, stderr = self._podman_status(
+                        "pull", "--quiet", *platform_args, container_tag
+                    )
+                    if return_code:
+                        self.logger.warning(
+                            "Failed to pull image %s: %s", container_tag, stderr
+                        )
+        except OSError as e:
+            self.logger.warning("Failed to pull image %s: %s", container_tag, e)
+        finally:
+            self._images_ready[container_tag].set()
+
     def start_execution(self, metadata: Metadata) -> Execution:
         """Start execution."""
         if metadata.container_image_tag is None:
             raise ValueError("No container image tag specified in metadata")
-        container_tag = self.image_overrides.get(
-            metadata.container_image_tag, metadata.container_image_tag
+        container_tag = _normalize_tag(
+            self.image_overrides.get(
+                metadata.container_image_tag, metadata.container_image_tag
+            )
         )
-        if container_tag.startswith("docker://"):
-            container_tag = container_tag.replace("docker://", "docker.io/", 1)
-        elif not container_tag.startswith("docker.io/"):
-            container_tag = f"docker.io/{container_tag}"
+        image_ready = self._images_ready.get(container_tag)
+        if image_ready is not None:
+            image_ready.wait()
 
+        output_dir = self.data_dir / (
+            f"{self._name_prefix}{self.execution_counter}_{metadata.name}"
+        )
         self.execution_counter += 1
+        output_dir.mkdir(parents=True, exist_ok=True)
         return _PodmanExecution(
             logger=self.logger,
-            output_dir=self.data_dir
-            / f"{self.uid}_{self.execution_counter - 1}_{metadata.name}",
+            output_dir=output_dir,
             metadata=metadata,
             container_tag=container_tag,
             podman_user_id=self.podman_user_id,
@@ -275,3 +693,18 @@ class PodmanRunner(Runner):
             podman_extra_args=self.podman_extra_args,
             environ=self.environ,
         )
+
+    def run_many(
+        self,
+        jobs: typing.Iterable[tuple[Execution, list[str]]],
+        max_concurrency: int | None = None,
+    ) -> list[BaseException | None]:
+        """Run prepared executions concurrently.
+
+        Returns the exception raised by each job (or `None`) in submission order.
+        """
+        with ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="styx_podman_run"
+        ) as pool:
+            futures = [pool.submit(execution.run, cargs) for execution, cargs in jobs]
+        return [future.exception() for future in futures]
@@ -0,0 +1,379 @@
+"""Tests for the Podman runner using a stub podman executable."""
+
+import asyncio
+import logging
+import os
+import pathlib as pl
+import time
+
+import pytest
+from styxdefs import Metadata
+
+from styxpodman import (
+    PodmanRunner,
+    StyxPodmanError,
+    _LineReader,
+    _LogLineReader,
+    _platform_args,
+    _podman_mount,
+)
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="stub podman is bash")
+
+_STUB_PODMAN = """#!/bin/bash
+if [ "$1" = image ] || [ "$1" = pull ]; then
+    if [ "$1" = pull ] && [ -n "$STUB_PULL_SLEEP" ]; then
+        sleep "$STUB_PULL_SLEEP"
+    fi
+    echo "$*" >> "{stub_dir}/images"
+    if [ "$1" = image ]; then
+        exit "${{STUB_IMAGE_RC:-0}}"
+    fi
+    exit 0
+fi
+echo "$$" > "{stub_dir}/pid"
+printf '%s\\n' "$@" > "{stub_dir}/args"
+prev=
+for arg in "$@"; do
+    if [ "$prev" = --env-file ]; then
+        cp "$arg" "{stub_dir}/env"
+    fi
+    prev="$arg"
+done
+echo out
+echo err >&2
+if [ -n "$STUB_SLEEP" ]; then
+    exec sleep "$STUB_SLEEP"
+fi
+exit "${{STUB_RC:-0}}"
+"""
+
+
+@pytest.fixture
+def stub_dir(tmp_path: pl.Path) -> pl.Path:
+    """Directory holding the stub podman executable and its records."""
+    stub_dir = tmp_path / "stub"
+    stub_dir.mkdir()
+    podman = stub_dir / "podman"
+    podman.write_text(_STUB_PODMAN.format(stub_dir=stub_dir))
+    podman.chmod(0o755)
+    return stub_dir
+
+
+@pytest.fixture
+def runner(stub_dir: pl.Path, tmp_path: pl.Path) -> PodmanRunner:
+    """PodmanRunner using the stub podman executable."""
+    return PodmanRunner(
+        podman_executable=str(stub_dir / "podman"), data_dir=tmp_path / "data"
+    )
+
+
+@pytest.fixture
+def metadata() -> Metadata:
+    """Metadata for a dummy tool."""
+    return Metadata(
+        id="test", name="tool", package="pkg", container_image_tag="image:1"
+    )
+
+
+def test_run_async(runner: PodmanRunner, metadata: Metadata) -> None:
+    """Test run_async dispatches output lines to the handlers."""
+    stdout: list[str] = []
+    stderr: list[str] = []
+    execution = runner.start_execution(metadata)
+    asyncio.run(execution.run_async(["true"], stdout.append, stderr.append))  # type: ignore
+    assert stdout == ["out"]
+    assert stderr == ["err"]
+
+
+def test_run_async_cancel_kills_podman(
+    runner: PodmanRunner,
+    metadata: Metadata,
+    stub_dir: pl.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test cancelling run_async kills and reaps the podman process."""
+    monkeypatch.setenv("STUB_SLEEP", "30")
+    execution = runner.start_execution(metadata)
+
+    async def run() -> None:
+        await asyncio.wait_for(
+            execution.run_async(["sleep"], lambda _: None, lambda _: None),  # type: ignore
+            0.5,
+        )
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run())
+    pid = int((stub_dir / "pid").read_text())
+    with pytest.raises(ProcessLookupError):
+        os.kill(pid, 0)
+
+
+def _podman_args(stub_dir: pl.Path) -> list[str]:
+    """Arguments the stub podman was last run with."""
+    return (stub_dir / "args").read_text().splitlines()
+
+
+def test_input_file_reuses_mounts(
+    runner: PodmanRunner, metadata: Metadata, stub_dir: pl.Path, tmp_path: pl.Path
+) -> None:
+    """Test repeated inputs and shared parents reuse a single mount."""
+    (tmp_path / "in").mkdir()
+    (tmp_path / "in" / "a.txt").write_text("a")
+    (tmp_path / "in" / "b.txt").write_text("b")
+    execution = runner.start_execution(metadata)
+
+    a = execution.input_file(tmp_path / "in" / "a.txt")
+    assert execution.input_file(tmp_path / "in" / "a.txt") == a
+    assert execution.input_file(tmp_path / "in" / "a.txt", mutable=True) != a
+    b = execution.input_file(tmp_path / "in" / "b.txt", resolve_parent=True)
+    a_parent = execution.input_file(tmp_path / "in" / "a.txt", resolve_parent=True)
+    assert b.rsplit("/", 1)[0] == a_parent.rsplit("/", 1)[0]
+
+    execution.run(["true"], lambda _: None, lambda _: None)
+    # Three input mounts plus the output directory
+    assert _podman_args(stub_dir).count("--mount") == 4
+
+
+def test_line_reader() -> None:
+    """Test line splitting across chunks, line endings and a final partial line."""
+    lines: list[str] = []
+    reader = _LineReader(lines.append)
+    data = "a\r\nbé\rc\n\nd".encode()
+    for i in range(len(data)):
+        reader.feed(data[i : i + 1])
+    reader.feed(b"", final=True)
+    assert lines == ["a", "bé", "c", "", "d"]
+
+
+def test_run_many(
+    runner: PodmanRunner, metadata: Metadata, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test run_many runs every job and reports errors in order."""
+    jobs = [(runner.start_execution(metadata), ["true"]) for _ in range(3)]
+    assert runner.run_many(jobs, max_concurrency=2) == [None, None, None]
+
+    monkeypatch.setenv("STUB_RC", "1")
+    errors = runner.run_many([(runner.start_execution(metadata), ["false"])])
+    assert len(errors) == 1
+    assert isinstance(errors[0], StyxPodmanError)
+
+
+def test_run(runner: PodmanRunner, metadata: Metadata, stub_dir: pl.Path) -> None:
+    """Test run execs the command from run.sh and dispatches output lines."""
+    stdout: list[str] = []
+    stderr: list[str] = []
+    execution = runner.start_execution(metadata)
+    execution.run(["echo", "hello world"], stdout.append, stderr.append)
+    assert stdout == ["out"]
+    assert stderr == ["err"]
+    assert (execution.output_dir / "run.sh").read_text() == (  # type: ignore
+        "#!/bin/bash\nexec echo 'hello world'\n"
+    )
+    assert _podman_args(stub_dir)[-2:] == ["docker.io/image:1", "./run.sh"]
+
+
+def test_fast_rootless(
+    stub_dir: pl.Path, tmp_path: pl.Path, metadata: Metadata
+) -> None:
+    """Test fast rootless options never override the user's podman arguments."""
+    runner = PodmanRunner(
+        podman_executable=str(stub_dir / "podman"),
+        podman_extra_args=["--net", "host", "--pids-limit=500"],
+        data_dir=tmp_path / "data",
+        fast_rootless=True,
+    )
+    runner.start_execution(metadata).run(["true"], lambda _: None, lambda _: None)
+    args = _podman_args(stub_dir)
+    assert args[1:8] == [
+        "--userns=keep-id",
+        "--security-opt",
+        "label=disable",
+        "--net",
+        "host",
+        "--pids-limit=500",
+        "--rm",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("image_rc", "commands"),
+    [
+        ("0", ["image exists docker.io/image:1"]),
+        ("1", ["image exists docker.io/image:1", "pull --quiet docker.io/image:1"]),
+    ],
+)
+def test_preload_images(
+    image_rc: str,
+    commands: list[str],
+    stub_dir: pl.Path,
+    tmp_path: pl.Path,
+    metadata: Metadata,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test preloaded images are pulled only when missing and awaited on start."""
+    monkeypatch.setenv("STUB_IMAGE_RC", image_rc)
+    monkeypatch.setenv("STUB_PULL_SLEEP", "0.3")
+    runner = PodmanRunner(
+        podman_executable=str(stub_dir / "podman"),
+        data_dir=tmp_path / "data",
+        preload_images=["image:1", "docker.io/image:1"],
+    )
+    runner.start_execution(metadata)
+    assert (stub_dir / "images").read_text().splitlines() == commands
+
+
+def test_input_file_not_found(
+    runner: PodmanRunner, metadata: Metadata, tmp_path: pl.Path
+) -> None:
+    """Test missing inputs are reported before running podman."""
+    execution = runner.start_execution(metadata)
+    with pytest.raises(FileNotFoundError):
+        execution.input_file(tmp_path / "missing.txt")
+    with pytest.raises(FileNotFoundError):
+        execution.input_file(tmp_path / "missing" / "a.txt", resolve_parent=True)
+
+
+def test_run_async_handler_error(
+    runner: PodmanRunner, metadata: Metadata, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test a raising handler leaves no tasks behind and podman is reaped once."""
+    execution = runner.start_execution(metadata)
+
+    def handle_stdout(line: str) -> None:
+        # Give podman time to exit so the error is handled after its exit
+        time.sleep(0.2)
+        raise RuntimeError(line)
+
+    async def run() -> None:
+        with pytest.raises(RuntimeError):
+            await execution.run_async(["true"], handle_stdout, lambda _: None)  # type: ignore
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+
+    asyncio.run(run())
+    assert not [r for r in caplog.records if r.name == "asyncio"]
+
+
+@pytest.mark.parametrize(
+    ("environ", "env_file"),
+    [
+        ({"A": "1"}, False),
+        ({key: f"value {key}" for key in "ABCDE"}, True),
+        ({**{key: "value" for key in "ABCD"}, "E": "multi\nline"}, False),
+    ],
+)
+def test_run_environ(
+    environ: dict[str, str],
+    env_file: bool,
+    stub_dir: pl.Path,
+    tmp_path: pl.Path,
+    metadata: Metadata,
+) -> None:
+    """Test environments use an env file only when large and line-safe."""
+    runner = PodmanRunner(
+        podman_executable=str(stub_dir / "podman"),
+        data_dir=tmp_path / "data",
+        environ=environ,
+    )
+    execution = runner.start_execution(metadata)
+    execution.run(["true"], lambda _: None, lambda _: None)
+    args = _podman_args(stub_dir)
+
+    if env_file:
+        path = args[args.index("--env-file") + 1]
+        assert not os.path.exists(path)
+        assert not path.startswith(str(execution.output_dir))  # type: ignore
+        assert (stub_dir / "env").read_text() == "".join(
+            f"{key}={value}\n" for key, value in environ.items()
+        )
+    else:
+        assert "--env-file" not in args
+        assert args.count("--env") == len(environ)
+
+
+def test_run_environ_snapshot(
+    stub_dir: pl.Path, tmp_path: pl.Path, metadata: Metadata
+) -> None:
+    """Test later changes to the runner environment do not affect an execution."""
+    environ = {key: "value" for key in "ABCDE"}
+    runner = PodmanRunner(
+        podman_executable=str(stub_dir / "podman"),
+        data_dir=tmp_path / "data",
+        environ=environ,
+    )
+    execution = runner.start_execution(metadata)
+    environ["F"] = "multi\nline"
+    execution.run(["true"], lambda _: None, lambda _: None)
+    assert (
+        stub_dir / "env"
+    ).read_text() == "A=value\nB=value\nC=value\nD=value\nE=value\n"
+
+
+def test_log_line_reader(caplog: pytest.LogCaptureFixture) -> None:
+    """Test the lines completed by each chunk are logged as one record."""
+    logger = logging.getLogger("styx_podman_test")
+    reader = _LogLineReader(logger, logging.WARNING)
+    with caplog.at_level(logging.WARNING, logger.name):
+        reader.feed(b"a\nb\nc")
+        reader.feed(b"", final=True)
+    assert [r.getMessage() for r in caplog.records] == ["a\nb", "c"]
+
+
+def test_run_logs_output(
+    runner: PodmanRunner, metadata: Metadata, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test output is logged when no handlers are given."""
+    with caplog.at_level(logging.INFO, runner.logger_name):
+        runner.start_execution(metadata).run(["true"])
+    assert [
+        (r.levelno, r.getMessage())
+        for r in caplog.records
+        if not r.getMessage().startswith(("Running", "Executed"))
+    ] == [(logging.INFO, "out"), (logging.ERROR, "err")]
+
+
+def test_platform_args() -> None:
+    """Test platform options are extracted in both spellings."""
+    assert _platform_args(
+        ["--platform=linux/arm64", "--rm", "--arch", "arm64", "--os=linux", "--variant"]
+    ) == ["--platform=linux/arm64", "--arch", "arm64", "--os=linux"]
+
+
+def test_preload_images_platform(
+    stub_dir: pl.Path, tmp_path: pl.Path, metadata: Metadata
+) -> None:
+    """Test images are always pulled for the requested platform when one is set."""
+    runner = PodmanRunner(
+        podman_executable=str(stub_dir / "podman"),
+        podman_extra_args=["--platform", "linux/arm64"],
+        data_dir=tmp_path / "data",
+        preload_images=["image:1"],
+    )
+    runner.start_execution(metadata).run(["true"], lambda _: None, lambda _: None)
+    assert (stub_dir / "images").read_text().splitlines() == [
+        "pull --quiet --platform linux/arm64 docker.io/image:1"
+    ]
+    assert not any(arg.startswith("--pull") for arg in _podman_args(stub_dir))
+
+
+def test_podman_mount() -> None:
+    """Test mount arguments are escaped only when needed."""
+    assert (
+        _podman_mount("/data/in", "/styx_input/0/in", readonly=True)
+        == "type=bind,source=/data/in,target=/styx_input/0/in,readonly"
+    )
+    assert (
+        _podman_mount('/data/"in"', "/x\\y", readonly=False)
+        == 'type=bind,source=/data/\\"in\\",target=/x\\\\y'
+    )
+
+
+def test_input_file_comma(
+    runner: PodmanRunner, metadata: Metadata, tmp_path: pl.Path
+) -> None:
+    """Test paths containing commas are rejected when the input is registered."""
+    (tmp_path / "a,b").mkdir()
+    execution = runner.start_execution(metadata)
+    with pytest.raises(ValueError):
+        execution.input_file(tmp_path / "a,b")
+    assert execution.input_mounts == []  # type: ignore